@@ -1,11 +1,12 @@
-import json
 import os
+import orjson
 from typing import Dict, List
 from typing import Dict, List
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import logging
-from app.scorer import score_resume
+from app.scorer import score_resume, build_skill_lemma_cache, build_skill_phrase_index, build_goal_index, load_model, load_vectorizer, compile_model, compile_vectorizer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,7 +16,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Resume Scoring Microservice",
     description="Containerized microservice for scoring student resumes offline",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Utility function for file path computation
@@ -26,19 +28,35 @@ def get_project_path(filename: str) -> str:
 
 # Load and validate config and JSON files at startup
 try:
-    config = json.load(open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.json"), "r"))
+    config = orjson.loads(open(os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.json"), "rb").read())
     if "model_goals_supported" not in config:
         raise ValueError("Missing 'model_goals_supported' in config.json")
-    goals_map = json.load(open(get_project_path("goals.json"), "r"))
-    suggestion_map = json.load(open(get_project_path("suggestions.json"), "r"))
-    skill_groups = json.load(open(get_project_path("skill_groups.json"), "r"))
+    goals_map = orjson.loads(open(get_project_path("goals.json"), "rb").read())
+    suggestion_map = orjson.loads(open(get_project_path("suggestions.json"), "rb").read())
+    skill_groups = orjson.loads(open(get_project_path("skill_groups.json"), "rb").read())
+    alternate_skills_map = orjson.loads(open(get_project_path("alternate_skills.json"), "rb").read())
 except FileNotFoundError as e:
     logger.error(f"Error loading configuration file: {str(e)}")
     raise
-except json.JSONDecodeError as e:
+except orjson.JSONDecodeError as e:
     logger.error(f"Invalid JSON in configuration file: {str(e)}")
     raise
 
+# MATCHING_WORKERS overrides config.json, e.g. to run one fuzzy-matching thread per Gunicorn worker
+if "MATCHING_WORKERS" in os.environ:
+    config["matching_workers"] = int(os.environ["MATCHING_WORKERS"])
+
+# Lemmatize all skill names and alternates once instead of on every request
+skill_lemma_cache = build_skill_lemma_cache(goals_map, alternate_skills_map)
+skill_phrase_index = {goal: build_skill_phrase_index(goal_skills, alternate_skills_map, skill_lemma_cache) for goal, goal_skills in goals_map.items()}
+goal_index = build_goal_index(goals_map, skill_groups)
+
+# Load every supported goal's model and vectorizer once; numpy arrays are memory-mapped read-only
+models = {goal: load_model(goal, mmap_mode="r") for goal in config["model_goals_supported"]}
+vectorizers = {goal: load_vectorizer(goal, mmap_mode="r") for goal in config["model_goals_supported"]}
+compiled_models = {goal: compile_model(model) for goal, model in models.items()}
+compiled_vectorizers = {goal: compile_vectorizer(vectorizer) for goal, vectorizer in vectorizers.items()}
+
 # Pydantic models for request/response validation
 class ScoreRequest(BaseModel):
     student_id: str
@@ -88,7 +106,15 @@ def post_score(request: ScoreRequest):
             config=config,
             goals_map=goals_map,
             suggestion_map=suggestion_map,
-            skill_groups=skill_groups
+            skill_groups=skill_groups,
+            alternate_skills_map=alternate_skills_map,
+            skill_lemma_cache=skill_lemma_cache,
+            skill_phrase_index=skill_phrase_index.get(request.goal),
+            model=models[request.goal],
+            vectorizer=vectorizers[request.goal],
+            goal_index=goal_index,
+            compiled_model=compiled_models[request.goal],
+            compiled_vectorizer=compiled_vectorizers[request.goal]
         )
         logger.info(f"Scoring completed for student_id: {request.student_id}")
         return result
@@ -1,11 +1,16 @@
-import json
 import os
+import orjson
+import functools
 import joblib
-from typing import Dict, Any, List, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import Pipeline
+from typing import Dict, Any, List, Set, Tuple
 import nltk
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import wordnet
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process
 import logging
 
 # Initialize logger
@@ -14,53 +19,130 @@ logger = logging.getLogger(__name__)
 # Initialize lemmatizer
 lemmatizer = WordNetLemmatizer()
 
+# Score weight and missing-skill sort rank for each skill importance level
+IMPORTANCE_WEIGHTS = {"core": 3, "important": 2, "nice_to_have": 1}
+IMPORTANCE_ORDER = {"core": 1, "important": 2, "nice_to_have": 3}
+
 def get_project_path(filename: str) -> str:
     """Compute file path relative to project root."""
     project_root = os.path.dirname(os.path.dirname(__file__))
     return os.path.join(project_root, "data", filename)
 
-def get_wordnet_pos(word):
-    """Map POS tag to first character lemmatize() accepts."""
-    tag = nltk.pos_tag([word])[0][1][0].upper()
+def get_wordnet_pos(treebank_tag):
+    """Map a Penn Treebank POS tag to the WordNet POS lemmatize() accepts."""
     tag_dict = {"J": wordnet.ADJ, "N": wordnet.NOUN, "V": wordnet.VERB, "R": wordnet.ADV}
-    return tag_dict.get(tag, wordnet.NOUN)
+    return tag_dict.get(treebank_tag[:1].upper(), wordnet.NOUN)
+
+@functools.lru_cache(maxsize=100_000)
+def lemmatize_token(token, pos):
+    """Lemmatize a single token; memoized since tokens repeat heavily across resumes."""
+    return lemmatizer.lemmatize(token, pos)
 
+@functools.lru_cache(maxsize=1024)
 def lemmatize_text_for_matching(text):
     """Tokenize and lemmatize text, return as a string."""
     tokens = nltk.word_tokenize(text.lower())
-    lemmatized = [lemmatizer.lemmatize(token, get_wordnet_pos(token)) for token in tokens]
+    # Tag the whole token list in one pass rather than calling pos_tag once per token
+    tagged = nltk.pos_tag(tokens)
+    lemmatized = [lemmatize_token(token, get_wordnet_pos(tag)) for token, tag in tagged]
     return ' '.join(lemmatized)
 
-def phrase_in_lemmatized_text(phrase, lemmatized_text, threshold=70, config=None):
-    """Check if phrase exists in lemmatized text using fuzzy matching."""
-    phrase_lemmatized = lemmatize_text_for_matching(phrase)
-    phrase_words = phrase_lemmatized.split()
-    n = len(phrase_words)
-    text_words = lemmatized_text.split()
-    max_score = 0
-    for i in range(len(text_words) - n + 1):
-        candidate = ' '.join(text_words[i:i+n])
-        score = fuzz.ratio(candidate, phrase_lemmatized)
-        max_score = max(max_score, score)
-        if score >= threshold:
-            return True
-    # Partial n-gram matching for multi-word skills
-    if n > 1:
-        for word in phrase_words:
-            for text_word in text_words:
-                if fuzz.ratio(word, text_word) >= 80:  # Lowered from 85
-                    return True
-    if config and config.get("log_score_details", False):
-        logger.info(f"Skill '{phrase}' max fuzzy ratio: {max_score} (threshold={threshold})")
-    return False
+def build_skill_lemma_cache(goals_map: Dict, alternate_skills_map: Dict) -> Dict[str, Tuple[str, List[str]]]:
+    """Lemmatize every goal skill and its alternates once, keyed by the original phrase."""
+    cache = {}
+    for goal_skills in goals_map.values():
+        for item in goal_skills:
+            for phrase in [item["name"]] + alternate_skills_map.get(item["name"], []):
+                if phrase not in cache:
+                    phrase_lemmatized = lemmatize_text_for_matching(phrase)
+                    cache[phrase] = (phrase_lemmatized, phrase_lemmatized.split())
+    return cache
+
+def build_skill_phrase_index(goal_skills: List[Dict], alternate_skills_map: Dict,
+                             skill_lemma_cache: Dict[str, Tuple[str, List[str]]] = None) -> Dict[int, Dict[Tuple[str, ...], Set[str]]]:
+    """Index one goal's lemmatized skill names and alternates by word count, mapping each word sequence to its skills."""
+    if skill_lemma_cache is None:
+        skill_lemma_cache = build_skill_lemma_cache({None: goal_skills}, alternate_skills_map)
+    index = {}
+    for item in goal_skills:
+        skill_name = item["name"]
+        for phrase in [skill_name] + alternate_skills_map.get(skill_name, []):
+            phrase_words = tuple(skill_lemma_cache[phrase][1])
+            if phrase_words:
+                index.setdefault(len(phrase_words), {}).setdefault(phrase_words, set()).add(skill_name)
+    return index
+
+def find_exact_skill_matches(text_words: List[str], skill_phrase_index: Dict[int, Dict[Tuple[str, ...], Set[str]]]) -> Set[str]:
+    """Return skills whose name or an alternate appears verbatim in the tokenized text."""
+    word_positions = {}
+    for i, word in enumerate(text_words):
+        word_positions.setdefault(word, []).append(i)
+    matches = set()
+    for n, phrases in skill_phrase_index.items():
+        for phrase_words, skills in phrases.items():
+            if skills <= matches:
+                continue
+            # Only compare windows starting where the phrase's first word occurs
+            starts = word_positions.get(phrase_words[0])
+            if starts and (n == 1 or any(tuple(text_words[i:i+n]) == phrase_words for i in starts)):
+                matches.update(skills)
+    return matches
+
+def get_text_ngrams(text_words: List[str], n: int, ngram_cache: Dict[int, List[str]] = None) -> List[str]:
+    """Return the n-word windows of text_words, reusing ngram_cache across phrases of the same length."""
+    if ngram_cache is not None and n in ngram_cache:
+        return ngram_cache[n]
+    if n == 1:
+        # Single words need no joining, and repeated words cannot change the best score
+        ngrams = list(dict.fromkeys(text_words))
+    else:
+        ngrams = [' '.join(text_words[i:i+n]) for i in range(len(text_words) - n + 1)]
+    if ngram_cache is not None:
+        ngram_cache[n] = ngrams
+    return ngrams
+
+def fuzzy_phrase_scores(phrases: List[str], skill_lemma_cache: Dict[str, Tuple[str, List[str]]], text_words: List[str],
+                        workers: int = -1) -> Dict[str, float]:
+    """Best fuzzy ratio of each phrase against the text, scoring all phrases of a length in one cdist call.
+
+    Ratios are rounded to integers as fuzzywuzzy's fuzz.ratio did. A multi-word phrase with any word
+    matching a resume word (ratio >= 80) scores 100, since that partial match accepts it at any threshold.
+    """
+    # cdist releases the GIL and splits each score matrix across `workers` threads (-1 uses every core)
+    ngram_cache = {}
+    phrase_scores = {phrase: 0.0 for phrase in phrases}
+    phrases_by_length = {}
+    for phrase in phrase_scores:
+        phrase_lemmatized, phrase_words = skill_lemma_cache[phrase]
+        if phrase_words:
+            phrases_by_length.setdefault(len(phrase_words), []).append((phrase, phrase_lemmatized))
+    for n, group in phrases_by_length.items():
+        ngrams = get_text_ngrams(text_words, n, ngram_cache)
+        if not ngrams:
+            continue
+        scores = process.cdist([phrase_lemmatized for _, phrase_lemmatized in group], ngrams, scorer=fuzz.ratio, workers=workers)
+        for (phrase, _), best in zip(group, np.rint(scores.max(axis=1))):
+            phrase_scores[phrase] = float(best)
+    # Partial n-gram matching for multi-word skills: any phrase word close to any resume word
+    phrase_words = sorted({word for phrase, score in phrase_scores.items() if score < 100
+                           for word in skill_lemma_cache[phrase][1] if len(skill_lemma_cache[phrase][1]) > 1})
+    if phrase_words and text_words:
+        # Cut off half a point low so ratios that round up to 80 survive
+        scores = process.cdist(phrase_words, get_text_ngrams(text_words, 1, ngram_cache), scorer=fuzz.ratio, score_cutoff=79.5, workers=workers)
+        hit_words = {word for word, best in zip(phrase_words, np.rint(scores.max(axis=1))) if best >= 80}
+        for phrase in phrase_scores:
+            words = skill_lemma_cache[phrase][1]
+            if len(words) > 1 and hit_words.intersection(words):
+                phrase_scores[phrase] = 100.0
+    return phrase_scores
 
 def load_skill_groups() -> Dict[str, list]:
     """Load skill groups from JSON file."""
     path = get_project_path("skill_groups.json")
     try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError) as e:
         logger.error(f"Error loading skill_groups.json: {str(e)}")
         return {}
 
@@ -68,105 +150,221 @@ def load_alternate_skills() -> Dict[str, list]:
     """Load alternate skills from JSON file."""
     path = get_project_path("alternate_skills.json")
     try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError) as e:
         logger.error(f"Error loading alternate_skills.json: {str(e)}")
         return {}
 
-def load_model(goal: str):
+def load_model(goal: str, mmap_mode: str = None):
     """Load trained model for the specified goal."""
     model_dir = os.path.join(os.path.dirname(__file__), "model")
     filename = f"{goal.replace(' ', '_')}_model.pkl"
     model_path = os.path.join(model_dir, filename)
     try:
-        return joblib.load(model_path)
+        return joblib.load(model_path, mmap_mode=mmap_mode)
     except FileNotFoundError as e:
         logger.error(f"Error loading model {model_path}: {str(e)}")
         raise
 
-def load_vectorizer(goal: str):
+def load_vectorizer(goal: str, mmap_mode: str = None):
     """Load vectorizer for the specified goal."""
     model_dir = os.path.join(os.path.dirname(__file__), "model")
     filename = f"{goal.replace(' ', '_')}_vectorizer.pkl"
     model_path = os.path.join(model_dir, filename)
     try:
-        return joblib.load(model_path)
+        return joblib.load(model_path, mmap_mode=mmap_mode)
     except FileNotFoundError as e:
         logger.error(f"Error loading vectorizer {model_path}: {str(e)}")
         raise
 
-def score_resume(student_id: str, goal: str, resume_text: str, config: Dict[str, Any], goals_map: Dict, suggestion_map: Dict, skill_groups: Dict):
+def compile_vectorizer(vectorizer) -> Dict[str, Any]:
+    """Extract a fitted vectorizer's tokenizer and IDF weights for single-resume transforms.
+
+    Supports a TfidfVectorizer and the HashingVectorizer + TfidfTransformer pipeline built by
+    train_model.py. Returns None for configurations this fast path does not replicate.
+    """
+    if isinstance(vectorizer, Pipeline) and len(vectorizer.steps) == 2:
+        hasher, tfidf = vectorizer.steps[0][1], vectorizer.steps[1][1]
+        if not isinstance(hasher, HashingVectorizer) or not isinstance(tfidf, TfidfTransformer):
+            return None
+        if hasher.binary or hasher.norm is not None or not tfidf.use_idf or tfidf.sublinear_tf or tfidf.norm not in ("l2", None):
+            return None
+        return {
+            "hasher": hasher,
+            "idf": np.asarray(tfidf.idf_, dtype=np.float32),
+            "norm": tfidf.norm
+        }
+    if not hasattr(vectorizer, "vocabulary_") or not hasattr(vectorizer, "idf_"):
+        return None
+    if vectorizer.binary or vectorizer.sublinear_tf or vectorizer.norm not in ("l2", None):
+        return None
+    return {
+        "analyzer": vectorizer.build_analyzer(),
+        "vocabulary": vectorizer.vocabulary_,
+        "idf": np.asarray(vectorizer.idf_, dtype=np.float32),
+        "norm": vectorizer.norm
+    }
+
+def transform_compiled(compiled_vectorizer: Dict[str, Any], text: str) -> csr_matrix:
+    """TF-IDF transform a single text with a compiled vectorizer, returning a 1xV CSR row."""
+    idf = compiled_vectorizer["idf"]
+    if "hasher" in compiled_vectorizer:
+        # Hashed term counts need no vocabulary lookup; scale the non-zeros by their IDF in place
+        row = compiled_vectorizer["hasher"].transform([text])
+        indices = row.indices
+        values = row.data.astype(np.float32, copy=False) * idf[indices]
+    else:
+        vocabulary = compiled_vectorizer["vocabulary"]
+        ids = [vocabulary[term] for term in compiled_vectorizer["analyzer"](text) if term in vocabulary]
+        indices, counts = np.unique(np.asarray(ids, dtype=np.int32), return_counts=True)
+        values = counts.astype(np.float32) * idf[indices]
+    if compiled_vectorizer["norm"] == "l2":
+        norm = np.linalg.norm(values)
+        if norm > 0:
+            values /= norm
+    return csr_matrix((values, indices, [0, len(indices)]), shape=(1, len(idf)))
+
+def compile_model(model) -> Dict[str, Any]:
+    """Extract a binary LogisticRegression's coefficients as a contiguous float32 vector plus intercept."""
+    return {
+        "coef": np.ascontiguousarray(model.coef_[0], dtype=np.float32),
+        "intercept": float(model.intercept_[0])
+    }
+
+def predict_proba_compiled(compiled_model: Dict[str, Any], X) -> float:
+    """Positive-class probability for a single vectorized resume using compiled coefficients."""
+    # Gather only the resume's non-zero features instead of a dense dot over the whole coefficient vector
+    X = X.tocsr()
+    z = float(X.data.dot(compiled_model["coef"][X.indices])) + compiled_model["intercept"]
+    return float(1.0 / (1.0 + np.exp(-z)))
+
+def build_goal_index(goals_map: Dict, skill_groups: Dict) -> Dict[str, Dict[str, Any]]:
+    """Precompute each goal's skill names, importances, score weights, missing-skill order and group memberships."""
+    goal_index = {}
+    for goal, goal_skills in goals_map.items():
+        skills_with_importance = {item["name"]: item["importance"] for item in goal_skills}
+        names = tuple(skills_with_importance.keys())
+        importances = tuple(skills_with_importance.values())
+        weights = np.array([IMPORTANCE_WEIGHTS.get(importance, 0) for importance in importances], dtype=np.int32)
+        goal_index[goal] = {
+            "names": names,
+            "importance": importances,
+            "weights": weights,
+            "total_points": int(weights.sum()),
+            # Skill positions in the order missing skills are reported: by importance, then name
+            "missing_order": tuple(sorted(range(len(names)), key=lambda i: (IMPORTANCE_ORDER.get(importances[i], 99), names[i]))),
+            "group_skills": {
+                group: frozenset(name for name in skills_with_importance if name in skills_in_group)
+                for group, skills_in_group in skill_groups.get(goal, {}).items()
+            }
+        }
+    return goal_index
+
+def score_resume(student_id: str, goal: str, resume_text: str, config: Dict[str, Any], goals_map: Dict, suggestion_map: Dict, skill_groups: Dict,
+                 alternate_skills_map: Dict = None, skill_lemma_cache: Dict[str, Tuple[str, List[str]]] = None,
+                 skill_phrase_index: Dict[int, Dict[Tuple[str, ...], Set[str]]] = None,
+                 model=None, vectorizer=None, goal_index: Dict[str, Dict[str, Any]] = None,
+                 compiled_model: Dict[str, Any] = None, compiled_vectorizer: Dict[str, Any] = None):
     """Score a resume against a goal, returning matched/missing skills and suggestions."""
     # Validate input
     if not resume_text.strip():
         logger.error(f"Empty resume text for student_id: {student_id}")
         raise ValueError("Resume text cannot be empty")
 
-    # Load model and compute model score
+    # Compute model score, loading the model and vectorizer unless preloaded at startup
     try:
-        model = load_model(goal)
-        vectorizer = load_vectorizer(goal)
-        X_transformed = vectorizer.transform([resume_text])
-        prob = model.predict_proba(X_transformed)[0][1]
+        if model is None:
+            model = load_model(goal)
+        if compiled_vectorizer is not None:
+            X_transformed = transform_compiled(compiled_vectorizer, resume_text)
+        else:
+            if vectorizer is None:
+                vectorizer = load_vectorizer(goal)
+            X_transformed = vectorizer.transform([resume_text])
+        if compiled_model is not None:
+            prob = predict_proba_compiled(compiled_model, X_transformed)
+        else:
+            prob = model.predict_proba(X_transformed)[0][1]
     except Exception as e:
         logger.error(f"Error scoring resume for student_id {student_id}: {str(e)}")
         raise
 
-    # Extract goal-specific skills
-    goal_skills_with_importance = {item["name"]: item["importance"] for item in goals_map.get(goal, [])}
-    goal_skill_names = set(goal_skills_with_importance.keys())
-    importance_order = {"core": 1, "important": 2, "nice_to_have": 3}
+    # Extract goal-specific skills, precomputed at startup when available
+    if goal_index is None or goal not in goal_index:
+        goal_index = build_goal_index({goal: goals_map.get(goal, [])}, skill_groups)
+    goal_info = goal_index[goal]
+    goal_skill_names = goal_info["names"]
 
-    # Load alternate skills
-    alternate_skills_map = load_alternate_skills()
+    # Load alternate skills and lemmatized skill phrases unless precomputed at startup
+    if alternate_skills_map is None:
+        alternate_skills_map = load_alternate_skills()
+    if skill_lemma_cache is None:
+        skill_lemma_cache = build_skill_lemma_cache({goal: goals_map.get(goal, [])}, alternate_skills_map)
+    if skill_phrase_index is None:
+        skill_phrase_index = build_skill_phrase_index(goals_map.get(goal, []), alternate_skills_map, skill_lemma_cache)
 
     # Preprocess resume text
     lemmatized_resume_text = lemmatize_text_for_matching(resume_text)
     if config.get("log_score_details", False):
         logger.info(f"lemmatized_resume_text='{lemmatized_resume_text}'")
 
+    # Find exact skill/alternate mentions in one pass; only the rest need fuzzy matching
+    text_words = lemmatized_resume_text.split()
+    exact_matches = find_exact_skill_matches(text_words, skill_phrase_index)
+
+    # Score the remaining skills and their alternates once in batched cdist calls;
+    # both the confidence and partial thresholds are then checked against the same scores
+    confidence_threshold = 70  # Lowered from 75
+    partial_threshold = 55   # Lowered from 60
+    fuzzy_phrases = []
+    for skill_name in goal_skill_names:
+        if skill_name not in exact_matches:
+            fuzzy_phrases.append(skill_name)
+            fuzzy_phrases.extend(alternate_skills_map.get(skill_name, []))
+    fuzzy_scores = fuzzy_phrase_scores(fuzzy_phrases, skill_lemma_cache, text_words, workers=config.get("matching_workers", -1))
+
     # Match skills using fuzzy phrase matching
     matched_skills = []
+    matched_mask = np.zeros(len(goal_skill_names), dtype=bool)
     all_missing_skills = []
-    for skill_name in goal_skill_names:
-        confidence_threshold = 70  # Lowered from 75
-        partial_threshold = 55   # Lowered from 60
-        if phrase_in_lemmatized_text(skill_name, lemmatized_resume_text, threshold=confidence_threshold, config=config):
+    for i, skill_name in enumerate(goal_skill_names):
+        if skill_name in exact_matches:
+            matched_skills.append(skill_name)
+            matched_mask[i] = True
+            if config.get("log_score_details", False):
+                logger.info(f"Matched skill '{skill_name}' exactly")
+        elif fuzzy_scores[skill_name] >= confidence_threshold:
             matched_skills.append(skill_name)
+            matched_mask[i] = True
             if config.get("log_score_details", False):
                 logger.info(f"Matched skill '{skill_name}' directly")
         else:
             found_alternate = False
             if skill_name in alternate_skills_map:
                 for alt in alternate_skills_map[skill_name]:
-                    if phrase_in_lemmatized_text(alt, lemmatized_resume_text, threshold=confidence_threshold, config=config):
+                    if fuzzy_scores[alt] >= confidence_threshold:
                         matched_skills.append(skill_name)
+                        matched_mask[i] = True
                         found_alternate = True
                         if config.get("log_score_details", False):
                             logger.info(f"Matched skill '{skill_name}' via alternate '{alt}'")
                         break
             if not found_alternate:
-                if phrase_in_lemmatized_text(skill_name, lemmatized_resume_text, threshold=partial_threshold, config=config):
+                if fuzzy_scores[skill_name] >= partial_threshold:
                     matched_skills.append(skill_name)
+                    matched_mask[i] = True
                     if config.get("log_score_details", False):
                         logger.info(f"Partially matched skill '{skill_name}' (fuzzy)")
                 else:
-                    importance = goal_skills_with_importance.get(skill_name, "unknown")
+                    importance = goal_info["importance"][i]
                     all_missing_skills.append((skill_name, importance))
                     if config.get("log_score_details", False):
-                        logger.info(f"Missing skill '{skill_name}' (Importance: {importance})")
+                        logger.info(f"Missing skill '{skill_name}' (Importance: {importance}, max fuzzy ratio: {fuzzy_scores[skill_name]:.0f})")
 
     # Calculate skill score
-    importance_weights = {"core": 3, "important": 2, "nice_to_have": 1}
-    total_skill_points = sum(
-        importance_weights.get(goal_skills_with_importance.get(skill, "nice_to_have"), 0)
-        for skill in goal_skill_names
-    )
-    matched_skill_points = sum(
-        importance_weights.get(goal_skills_with_importance.get(skill, "nice_to_have"), 0)
-        for skill in matched_skills
-    )
+    total_skill_points = goal_info["total_points"]
+    matched_skill_points = int(matched_mask.dot(goal_info["weights"]))
     skill_score = matched_skill_points / total_skill_points if total_skill_points > 0 else 0
 
     # Combine with model score
@@ -179,23 +377,24 @@ def score_resume(student_id: str, goal: str, resume_text: str, config: Dict[str,
 
     # Cap missing skills based on config
     max_missing_skills = config.get("max_missing_skills", 15)
-    sorted_missing_skills = sorted(all_missing_skills, key=lambda x: (importance_order.get(x[1], 99), x[0]))
-    capped_missing_skills_names = [skill_name for skill_name, _ in sorted_missing_skills][:max_missing_skills]
+    capped_missing_skills_names = [
+        goal_skill_names[i] for i in goal_info["missing_order"] if not matched_mask[i]
+    ][:max_missing_skills]
 
     # Generate suggestions
     suggestions = [suggestion_map.get(skill_name, f"Learn basics of {skill_name}") for skill_name in capped_missing_skills_names]
 
     # Group-level insights
     missing_grouped = {}
-    for group, skills_in_group in skill_groups.get(goal, {}).items():
-        group_skill_names = {item["name"] for item in goals_map.get(goal, []) if item["name"] in skills_in_group}
-        group_matched = [s for s in matched_skills if s in group_skill_names]
-        if group_matched:
-            to_recommend = sorted([s for s in group_skill_names if s not in matched_skills])
+    matched_set = set(matched_skills)
+    missing_set = {skill_name for skill_name, _ in all_missing_skills}
+    for group, group_skill_names in goal_info["group_skills"].items():
+        if group_skill_names & matched_set:
+            to_recommend = sorted(group_skill_names - matched_set)
             if to_recommend:
                 missing_grouped[group] = to_recommend
         else:
-            group_missing = [skill_name for skill_name, _ in all_missing_skills if skill_name in group_skill_names]
+            group_missing = group_skill_names & missing_set
             if group_missing:
                 missing_grouped[group] = sorted(group_missing)
 
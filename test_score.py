@@ -2,7 +2,13 @@ import unittest
 import os
 import json
 from unittest.mock import patch
-from app.scorer import score_resume, load_model, load_vectorizer
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import Pipeline
+from app.scorer import (score_resume, load_model, load_vectorizer, build_skill_lemma_cache,
+                        build_skill_phrase_index, find_exact_skill_matches, fuzzy_phrase_scores,
+                        compile_model, predict_proba_compiled,
+                        compile_vectorizer, transform_compiled)
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -19,6 +25,8 @@ class TestResumeScorer(unittest.TestCase):
             self.suggestion_map = json.load(f)
         with open(os.path.join(self.project_root, "data", "skill_groups.json")) as f:
             self.skill_groups = json.load(f)
+        with open(os.path.join(self.project_root, "data", "alternate_skills.json")) as f:
+            self.alternate_skills_map = json.load(f)
         
         # Sample resume text for testing
         self.sample_resume = "Proficient in Java, Python, Data Structures, Algorithms, SQL"
@@ -66,6 +74,102 @@ class TestResumeScorer(unittest.TestCase):
         # Validate score threshold
         self.assertEqual(result["is_pass"], result["score"] >= self.config["minimum_score_to_pass"])
 
+    def test_score_resume_with_skill_lemma_cache(self):
+        """Test score_resume gives the same result with skill lemmas precomputed at startup."""
+        skill_lemma_cache = build_skill_lemma_cache(self.goals_map, self.alternate_skills_map)
+        self.assertIn("Data Structures", skill_lemma_cache)
+        phrase_lemmatized, phrase_words = skill_lemma_cache["Data Structures"]
+        self.assertEqual(phrase_words, phrase_lemmatized.split())
+
+        kwargs = dict(
+            student_id=self.student_id,
+            goal=self.goal,
+            resume_text=self.sample_resume,
+            config=self.config,
+            goals_map=self.goals_map,
+            suggestion_map=self.suggestion_map,
+            skill_groups=self.skill_groups
+        )
+        expected = score_resume(**kwargs)
+        result = score_resume(
+            **kwargs,
+            alternate_skills_map=self.alternate_skills_map,
+            skill_lemma_cache=skill_lemma_cache
+        )
+        self.assertEqual(result, expected)
+
+    def test_find_exact_skill_matches(self):
+        """Test exact matching of skill names and alternates on word boundaries."""
+        goal_skills = [{"name": "Java", "importance": "core"}, {"name": "Machine Learning", "importance": "core"}]
+        alternate_skills_map = {"Machine Learning": ["ML"]}
+        skill_lemma_cache = {
+            "Java": ("java", ["java"]),
+            "Machine Learning": ("machine learning", ["machine", "learning"]),
+            "ML": ("ml", ["ml"])
+        }
+        index = build_skill_phrase_index(goal_skills, alternate_skills_map, skill_lemma_cache)
+        self.assertEqual(find_exact_skill_matches("proficient in javascript and ml".split(), index), {"Machine Learning"})
+        self.assertEqual(find_exact_skill_matches("java and machine learning".split(), index), {"Java", "Machine Learning"})
+
+    def test_fuzzy_phrase_scores(self):
+        """Test batched fuzzy scores, including partial word matches and scores below the thresholds."""
+        phrases = ["java", "data structure", "unit test", "distributed system", "c++"]
+        skill_lemma_cache = {phrase: (phrase, phrase.split()) for phrase in phrases}
+        text = "built distribute systems in jav with unit testing"
+        scores = fuzzy_phrase_scores(phrases, skill_lemma_cache, text.split())
+        self.assertEqual(scores, {
+            "java": 86,                 # "jav"
+            "data structure": 53,       # best raw ratio is kept even below the partial threshold
+            "unit test": 100,           # "unit" matches a resume word exactly
+            "distributed system": 100,  # "system" is within ratio 80 of "systems"
+            "c++": 0
+        })
+
+    def test_fuzzy_phrase_scores_round_like_fuzzywuzzy(self):
+        """Test ratios are rounded before the threshold check, as fuzzywuzzy's fuzz.ratio did."""
+        skill_lemma_cache = {"learning": ("learning", ["learning"])}
+        # Raw ratio is 54.55; fuzzywuzzy reported 55, which meets the partial threshold
+        scores = fuzzy_phrase_scores(["learning"], skill_lemma_cache, ["multithreading"])
+        self.assertEqual(scores["learning"], 55)
+
+    def test_compiled_model_matches_predict_proba(self):
+        """Test compiled-coefficient scoring matches predict_proba on every training resume."""
+        for goal in self.config["model_goals_supported"]:
+            model = load_model(goal)
+            vectorizer = load_vectorizer(goal)
+            compiled_model = compile_model(model)
+            file_name = f"{goal.replace(' ', '_').lower()}.json"
+            with open(os.path.join(self.project_root, "data", "training_data", file_name)) as f:
+                resume_texts = [item["resume_text"] for item in json.load(f)]
+            X_transformed = vectorizer.transform(resume_texts)
+            expected = model.predict_proba(X_transformed)[:, 1]
+            for i in range(X_transformed.shape[0]):
+                self.assertAlmostEqual(predict_proba_compiled(compiled_model, X_transformed[i]), expected[i], delta=1e-3)
+
+    def test_compiled_vectorizer_matches_transform(self):
+        """Test the compiled single-resume transform reproduces vectorizer.transform."""
+        texts = [
+            "Java developer with Python and SQL",
+            "Machine learning with Python, pandas and numpy",
+            "Data structures and algorithms in Java"
+        ]
+        vectorizers = [
+            TfidfVectorizer(ngram_range=(1, 3)),
+            # Same pipeline train_model.py builds
+            Pipeline([
+                ("hv", HashingVectorizer(n_features=2**14, ngram_range=(1, 3), alternate_sign=False, norm=None, dtype=np.float32)),
+                ("tfidf", TfidfTransformer())
+            ])
+        ]
+        for vectorizer in vectorizers:
+            vectorizer.fit(texts)
+            compiled_vectorizer = compile_vectorizer(vectorizer)
+            self.assertIsNotNone(compiled_vectorizer)
+            expected = vectorizer.transform([self.sample_resume]).toarray()
+            result = transform_compiled(compiled_vectorizer, self.sample_resume).toarray()
+            self.assertEqual(result.shape, expected.shape)
+            self.assertLess(abs(result - expected).max(), 1e-6)
+
     def test_score_resume_empty_resume_text(self):
         """Test score_resume with empty resume text."""
         with self.assertRaises(ValueError) as context: